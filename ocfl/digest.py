@@ -58,18 +58,26 @@ def file_digest(filename, digest_type='sha512'):
         raise ValueError("Unsupport digest type %s" % (digest_type))
 
 
-DIGEST_REGEXES = {
-    'sha512': r'''^[0-9a-fA-F]{128}$''',
-    'sha256': r'''^[0-9a-fA-F]{64}$''',
-    'sha1': r'''^[0-9a-fA-F]{40}$''',
-    'md5': r'''^[0-9a-fA-F]{32}$''',
-    'blake2b-512': r'''^[0-9a-fA-F]{128}$''',
-    'blake2b-384': r'''^[0-9a-fA-F]{96}$''',
-    'blake2b-256': r'''^[0-9a-fA-F]{64}$''',
-    'blake2b-160': r'''^[0-9a-fA-F]{40}$''',
+# Digest types with plain hex digests, and their lengths
+DIGEST_HEX_LENGTHS = {
+    'sha512': 128,
+    'sha256': 64,
+    'sha1': 40,
+    'md5': 32,
+    'blake2b-512': 128,
+    'blake2b-384': 96,
+    'blake2b-256': 64,
+    'blake2b-160': 40
+}
+HEX_DIGITS = b'0123456789abcdefABCDEF'
+
+# Regexes for the un-normalized form, hex forms built from DIGEST_HEX_LENGTHS
+DIGEST_REGEXES = dict((digest_type, r'''^[0-9a-fA-F]{%d}$''' % length)
+                      for digest_type, length in DIGEST_HEX_LENGTHS.items())
+DIGEST_REGEXES.update({
     'sha512-spec-ex': r'''^[0-9a-f]{15}\.\.\.[0-9a-f]{3}$''',
     'sha256-spec-ex': r'''^[0-9a-f]{6}\.\.\.[0-9a-f]{3}$'''
-}
+})
 
 
 def digest_regex(digest_type='sha512'):
@@ -5,26 +5,56 @@ as read with json.load(). Does not examine anything in storage.
 """
 import re
 
-from .digest import digest_regex, normalized_digest
+from .digest import digest_regex, normalized_digest, DIGEST_HEX_LENGTHS, HEX_DIGITS
 from .validation_logger import ValidationLogger
 from .w3c_datetime import str_to_datetime
 
+# Patterns used repeatedly in validation, compiled once
+ADDRESS_REGEX = re.compile(r'''\w{3,6}:''')
+ANY_REGEX = re.compile(r'''^.*$''')
+
+# Keys that MUST be present in an inventory, with error code if missing
+REQUIRED_INVENTORY_KEYS = (
+    ('id', 'E036a'),
+    ('type', 'E036b'),
+    ('digestAlgorithm', 'E036c'),
+    ('head', 'E036d'),
+    ('manifest', 'E041a'),
+    ('versions', 'E041b')
+)
+
+
+def looks_like_uri(iid):
+    """Check whether iid looks like a URI, starting with scheme and colon.
+
+    Uses string operations rather than a regex to check for one or more
+    word characters (alphanumeric or underscore) followed by a colon and
+    at least one more character that is not a newline.
+    """
+    colon = iid.find(':')
+    return (colon > 0 and all(c.isalnum() or c == '_' for c in iid[:colon])
+            and len(iid) > colon + 1 and iid[colon + 1] != '\n')
+
 
 def get_file_map(inventory, version_dir):
     """Get a map of file in state to files on disk for version_dir in inventory."""
     state = inventory['versions'][version_dir]['state']
     manifest = inventory['manifest']
     file_map = {}
-    for digest in state:
-        if digest in manifest:
-            for file in state[digest]:
-                file_map[file] = manifest[digest]
+    for digest, files in state.items():
+        content_files = manifest.get(digest)
+        if content_files is not None:
+            for file in files:
+                file_map[file] = content_files
     return file_map
 
 
 class InventoryValidator(object):
     """Class for OCFL Inventory Validator."""
 
+    # Compiled digest regexes, shared between instances, keyed by algorithm
+    compiled_digest_regexes = {}
+
     def __init__(self, log=None, where='???',
                  lax_digests=False):
         """Initialize OCFL Inventory Validator."""
@@ -38,6 +68,7 @@ class InventoryValidator(object):
         self.manifest_files = None
         self.unnormalized_digests = None
         self.head = 'UNKNOWN'
+        self.file_maps = {}  # cache of get_file_map() results by version_dir
         # Validation control
         self.lax_digests = lax_digests
 
@@ -51,59 +82,54 @@ class InventoryValidator(object):
 
     def validate(self, inventory):
         """Validate a given inventory."""
-        # Basic structure
         self.inventory = inventory
+        self.file_maps = {}
+        # Required keys, then basic structure of those present
+        for key, code in REQUIRED_INVENTORY_KEYS:
+            if key not in inventory:
+                self.error(code)
         if 'id' in inventory:
             iid = inventory['id']
-            if type(iid) != str or iid == '':
+            if not isinstance(iid, str) or iid == '':
                 self.error("E037")
-            elif not re.match(r'''(\w+):.+''', iid):
+            elif not looks_like_uri(iid):
                 self.warn("W005", id=iid)
-        else:
-            self.error("E036a")
-        if 'type' not in inventory:
-            self.error("E036b")
-        elif inventory['type'] != 'https://ocfl.io/1.0/spec/#inventory':
+        if 'type' in inventory and inventory['type'] != 'https://ocfl.io/1.0/spec/#inventory':
             self.error("E038")
-        if 'digestAlgorithm' not in inventory:
-            self.error("E036c")
-        elif inventory['digestAlgorithm'] == 'sha512':
-            pass
-        elif self.lax_digests:
-            self.digest_algorithm = inventory['digestAlgorithm']
-        elif inventory['digestAlgorithm'] == 'sha256':
-            self.warn("W004")
-            self.digest_algorithm = inventory['digestAlgorithm']
-        else:
-            self.error("E039", digest_algorithm=inventory['digestAlgorithm'])
+        if 'digestAlgorithm' in inventory:
+            digest_algorithm = inventory['digestAlgorithm']
+            if digest_algorithm == 'sha512':
+                pass
+            elif self.lax_digests:
+                self.digest_algorithm = digest_algorithm
+            elif digest_algorithm == 'sha256':
+                self.warn("W004")
+                self.digest_algorithm = digest_algorithm
+            else:
+                self.error("E039", digest_algorithm=digest_algorithm)
         if 'contentDirectory' in inventory:
             # Careful only to set self.content_directory if value is safe
             cd = inventory['contentDirectory']
-            if type(cd) != str or '/' in cd or cd in ['.', '..']:
+            if not isinstance(cd, str) or '/' in cd or cd in ['.', '..']:
                 self.error("E018")
             else:
                 self.content_directory = cd
-        if 'manifest' not in inventory:
-            self.error("E041a")
-        else:
-            (self.manifest_files, self.unnormalized_digests) = self.validate_manifest(inventory['manifest'])
-        if 'versions' not in inventory:
-            self.error("E041b")
-        else:
+        if 'manifest' in inventory:
+            (self.manifest_files, self.unnormalized_digests, content_digests) = self.validate_manifest(inventory['manifest'])
+        if 'versions' in inventory:
             self.all_versions = self.validate_version_sequence(inventory['versions'])
             digests_used = self.validate_versions(inventory['versions'], self.all_versions, self.unnormalized_digests)
-        if 'head' not in inventory:
-            self.error("E036d")
-        elif len(self.all_versions) > 0:
-            self.head = self.all_versions[-1]
-            if inventory['head'] != self.head:
-                self.error("E040", got=inventory['head'], expected=self.head)
         if len(self.all_versions) == 0:
             # Abort tests is we don't have a valid version sequence, otherwise
             # there will likely be spurious subsequent error reports
             return
-        if 'manifest' in inventory and 'versions' in inventory:
-            self.check_digests_present_and_used(self.manifest_files, digests_used)
+        if 'head' in inventory:
+            self.head = self.all_versions[-1]
+            if inventory['head'] != self.head:
+                self.error("E040", got=inventory['head'], expected=self.head)
+        # Having versions means digests_used was set above
+        if 'manifest' in inventory:
+            self.check_digests_present_and_used(content_digests, digests_used)
         if 'fixity' in inventory:
             self.validate_fixity(inventory['fixity'], self.manifest_files)
 
@@ -111,42 +137,51 @@ class InventoryValidator(object):
         """Validate manifest block in inventory.
 
         Returns:
-          * manifest_files, a mapping from file to digest for each file in
-              the manifest
+          * manifest_files, a set of the files (content paths) in the manifest.
+              Only the paths are kept, digests can be looked up in the
+              manifest itself if needed
           * unnormalized_digests - a set of the original digests in unnormalized
               form that MUST match exactly the values used in state blocks
+          * content_digests - a set of the normalized digests that have at least
+              one content path, which are those that may be used in state blocks
         """
-        manifest_files = {}
+        manifest_files = set()
         unnormalized_digests = set()
         manifest_digests = set()
-        if type(manifest) != dict:
+        content_digests = set()
+        if not isinstance(manifest, dict):
             self.error('E041c')
         else:
             content_paths = set()
             content_directories = set()
-            for digest in manifest:
-                m = re.match(self.digest_regex(), digest)
-                if not m:
-                    self.error('E025a', digest=digest, algorithm=self.digest_algorithm)  # wrong form of digest
-                elif type(manifest[digest]) != list:
-                    self.error('E092', digest=digest)  # must have path list value
+            # Single pass over digests and files with lookups done up front
+            error = self.error
+            digest_algorithm = self.digest_algorithm
+            is_valid_digest = self.digest_checker()
+            check_content_path = self.check_content_path
+            for digest, files in manifest.items():
+                if not is_valid_digest(digest):
+                    error('E025a', digest=digest, algorithm=digest_algorithm)  # wrong form of digest
+                elif not isinstance(files, list):
+                    error('E092', digest=digest)  # must have path list value
                 else:
                     unnormalized_digests.add(digest)
-                    norm_digest = normalized_digest(digest, self.digest_algorithm)
+                    norm_digest = normalized_digest(digest, digest_algorithm)
                     if norm_digest in manifest_digests:
                         # We have already seen this in different un-normalized form!
-                        self.error("E096", digest=norm_digest)
+                        error("E096", digest=norm_digest)
                     else:
                         manifest_digests.add(norm_digest)
-                    for file in manifest[digest]:
-                        manifest_files[file] = norm_digest
-                        self.check_content_path(file, content_paths, content_directories)
+                    if len(files) > 0:
+                        content_digests.add(norm_digest)
+                    manifest_files.update(files)
+                    for file in files:
+                        check_content_path(file, content_paths, content_directories)
             # Check for conflicting content paths
-            for path in content_directories:
-                if path in content_paths:
-                    self.error("E101", path=path)
+            for path in content_directories.intersection(content_paths):
+                error("E101", path=path)
 
-        return (manifest_files, unnormalized_digests)
+        return (manifest_files, unnormalized_digests, content_digests)
 
     def validate_fixity(self, fixity, manifest_files):
         """Validate fixity block in inventory.
@@ -154,30 +189,29 @@ class InventoryValidator(object):
         Check the structure of the fixity block and makes sure that only files
         listed in the manifest are referenced.
         """
-        if type(fixity) != dict:
+        if not isinstance(fixity, dict):
             self.error('E056a')
         else:
             for digest_algorithm in fixity:
                 known_digest = True
                 try:
-                    regex = digest_regex(digest_algorithm)
+                    regex = re.compile(digest_regex(digest_algorithm))
                 except ValueError:
                     if not self.lax_digests:
                         self.error('E056b', algorithm=self.digest_algorithm)
                         continue
                     # Match anything
-                    regex = r'''^.*$'''
+                    regex = ANY_REGEX
                     known_digest = False
                 fixity_algoritm_block = fixity[digest_algorithm]
-                if type(fixity_algoritm_block) != dict:
+                if not isinstance(fixity_algoritm_block, dict):
                     self.error('E057a', algorithm=self.digest_algorithm)
                 else:
                     digests_seen = set()
                     for digest in fixity_algoritm_block:
-                        m = re.match(regex, digest)
-                        if not m:
+                        if not regex.match(digest):
                             self.error('E057b', digest=digest, algorithm=digest_algorithm)  # wrong form of digest
-                        elif type(fixity_algoritm_block[digest]) != list:
+                        elif not isinstance(fixity_algoritm_block[digest], list):
                             self.error('E057c', digest=digest, algorithm=digest_algorithm)  # must have path list value
                         else:
                             if known_digest:
@@ -201,7 +235,7 @@ class InventoryValidator(object):
         not part of the valid sequence if an error is thrown.
         """
         all_versions = []
-        if type(versions) != dict:
+        if not isinstance(versions, dict):
             self.error("E044")
             return all_versions
         elif len(versions) == 0:
@@ -229,21 +263,22 @@ class InventoryValidator(object):
                 return all_versions
         if zero_padded:
             self.warn("W001")
-        # Have v1 and know format, work through to check sequence
-        for n in range(2, max_version_num + 1):
+        # Have v1 and know format, work through to check sequence. There
+        # can be no more in-sequence versions than there are keys in versions
+        # or than fit in the zero padding size
+        for n in range(2, min(len(versions), max_version_num) + 1):
             v = (fmt % n)
-            if v in versions:
-                all_versions.append(v)
+            if v not in versions:
+                break
+            all_versions.append(v)
+        if len(all_versions) < len(versions):
+            if len(all_versions) == max_version_num:
+                # We have included all possible versions up to the zero padding
+                # size, the extras must violate the zero-padding rule or be
+                # out of sequence
+                self.error("E011")
             else:
-                if len(versions) != (n - 1):
-                    self.error("E010")  # Extra version dirs outside sequence
-                return all_versions
-        # We have now included all possible versions up to the zero padding
-        # size, if there are more versions than this number then we must
-        # have extra that violate the zero-padding rule or are out of
-        # sequence
-        if len(versions) > max_version_num:
-            self.error("E011")
+                self.error("E010")  # Extra version dirs outside sequence
         return all_versions
 
     def validate_versions(self, versions, all_versions, unnormalized_digests):
@@ -256,49 +291,52 @@ class InventoryValidator(object):
           * all_versions - an ordered list of the versions to look at in versions
                            (all other keys in versions will be ignored)
 
-        Returns a list of digests_used which can then be checked against the
+        Returns a set of digests_used which can then be checked against the
         manifest.
         """
-        digests_used = []
+        digests_used = set()
+        error = self.error
+        warn = self.warn
+        validate_state_block = self.validate_state_block
         for v in all_versions:
             version = versions[v]
             if 'created' not in version:
-                self.error('E048', version=v)  # No created
-            elif type(versions[v]['created']) != str:
-                self.error('E049d', version=v)  # Bad created
+                error('E048', version=v)  # No created
+            elif not isinstance(version['created'], str):
+                error('E049d', version=v)  # Bad created
             else:
-                created = versions[v]['created']
+                created = version['created']
                 try:
-                    dt = str_to_datetime(created)
-                    if not re.search(r'''(Z|[+-]\d\d:\d\d)$''', created):  # FIXME - kludge
-                        self.error('E049a', version=v)
-                    if not re.search(r'''T\d\d:\d\d:\d\d''', created):  # FIXME - kludge
-                        self.error('E049b', version=v)
+                    (dt, has_timezone, has_seconds) = str_to_datetime(created, return_flags=True)
+                    if not has_timezone:
+                        error('E049a', version=v)
+                    if not has_seconds:
+                        error('E049b', version=v)
                 except ValueError as e:
-                    self.error('E049c', version=v, description=str(e))
+                    error('E049c', version=v, description=str(e))
             if 'state' in version:
-                digests_used += self.validate_state_block(version['state'], version=v, unnormalized_digests=unnormalized_digests)
+                digests_used.update(validate_state_block(version['state'], version=v, unnormalized_digests=unnormalized_digests))
             else:
-                self.error('E048c', version=v)
+                error('E048c', version=v)
             if 'message' not in version:
-                self.warn('W007a', version=v)
-            elif type(version['message']) != str:
-                self.error('E094', version=v)
+                warn('W007a', version=v)
+            elif not isinstance(version['message'], str):
+                error('E094', version=v)
             if 'user' not in version:
-                self.warn('W007b', version=v)
+                warn('W007b', version=v)
             else:
                 user = version['user']
-                if type(user) != dict:
-                    self.error('E054a', version=v)
+                if not isinstance(user, dict):
+                    error('E054a', version=v)
                 else:
-                    if 'name' not in user or type(user['name']) != str:
-                        self.error('E054b', version=v)
+                    if 'name' not in user or not isinstance(user['name'], str):
+                        error('E054b', version=v)
                     if 'address' not in user:
-                        self.warn('W008', version=v)
-                    elif type(user['address']) != str:
-                        self.error('E054c', version=v)
-                    elif not re.match(r'''\w{3,6}:''', user['address']):
-                        self.warn('W009', version=v)
+                        warn('W008', version=v)
+                    elif not isinstance(user['address'], str):
+                        error('E054c', version=v)
+                    elif not ADDRESS_REGEX.match(user['address']):
+                        warn('W009', version=v)
         return digests_used
 
     def validate_state_block(self, state, version, unnormalized_digests):
@@ -306,42 +344,45 @@ class InventoryValidator(object):
 
         The version is used only for error reporting.
 
-        Returns a list of content digests referenced in the state block.
+        Returns a set of content digests referenced in the state block.
         """
-        digests = []
+        digests = set()
         logical_paths = set()
         logical_directories = set()
-        if type(state) != dict:
+        if not isinstance(state, dict):
             self.error('E050c', version=version)
         else:
-            digest_regex = self.digest_regex()
-            for digest in state:
-                if not re.match(self.digest_regex(), digest):
-                    self.error('E050d', version=version, digest=digest)
-                elif type(state[digest]) != list:
-                    self.error('E050e', version=version, digest=digest)
+            error = self.error
+            digest_algorithm = self.digest_algorithm
+            is_valid_digest = self.digest_checker()
+            check_logical_path = self.check_logical_path
+            for digest, paths in state.items():
+                if not is_valid_digest(digest):
+                    error('E050d', version=version, digest=digest)
+                elif not isinstance(paths, list):
+                    error('E050e', version=version, digest=digest)
                 else:
-                    for path in state[digest]:
-                        self.check_logical_path(path, version, logical_paths, logical_directories)
+                    for path in paths:
+                        check_logical_path(path, version, logical_paths, logical_directories)
                     if digest not in unnormalized_digests:
                         # Exact string value must match, not just normalized
-                        self.error("E050f", version=version, digest=digest)
-                    norm_digest = normalized_digest(digest, self.digest_algorithm)
-                    digests.append(norm_digest)
+                        error("E050f", version=version, digest=digest)
+                    digests.add(normalized_digest(digest, digest_algorithm))
             # Check for conflicting logical paths
-            for path in logical_directories:
-                if path in logical_paths:
-                    self.error("E095", version=version, path=path)
+            for path in logical_directories.intersection(logical_paths):
+                error("E095", version=version, path=path)
         return digests
 
-    def check_digests_present_and_used(self, manifest_files, digests_used):
-        """Check all digests in manifest that are needed are present and used."""
-        in_manifest = set(manifest_files.values())
-        in_state = set(digests_used)
-        not_in_manifest = in_state.difference(in_manifest)
+    def check_digests_present_and_used(self, in_manifest, digests_used):
+        """Check all digests in manifest that are needed are present and used.
+
+        in_manifest and digests_used are expected to be sets of normalized
+        digests, the latter as returned by validate_versions().
+        """
+        not_in_manifest = digests_used.difference(in_manifest)
         if len(not_in_manifest) > 0:
             self.error("E050a", digests=", ".join(sorted(not_in_manifest)))
-        not_in_state = in_manifest.difference(in_state)
+        not_in_state = in_manifest.difference(digests_used)
         if len(not_in_state) > 0:
             self.error("E050b", digests=", ".join(sorted(not_in_state)))
 
@@ -355,6 +396,33 @@ class InventoryValidator(object):
         # Match anything
         return r'''^.*$'''
 
+    def compiled_digest_regex(self):
+        """Compiled form of digest_regex(), cached for known algorithms."""
+        regex = self.compiled_digest_regexes.get(self.digest_algorithm)
+        if regex is None:
+            try:
+                regex = re.compile(digest_regex(self.digest_algorithm))
+            except ValueError:
+                # Unknown algorithm, report via digest_regex() and don't cache
+                self.digest_regex()
+                return ANY_REGEX
+            self.compiled_digest_regexes[self.digest_algorithm] = regex
+        return regex
+
+    def digest_checker(self):
+        """Function that checks un-normalized digest form for the digest algorithm.
+
+        Plain hex digests are checked by length and by deleting all hex digits
+        to see that nothing is left, avoiding a regex match for every digest.
+        Other digest forms are checked with compiled_digest_regex(). The check
+        is resolved once here so that callers can do so outside loops.
+        """
+        length = DIGEST_HEX_LENGTHS.get(self.digest_algorithm)
+        if length is None:
+            match = self.compiled_digest_regex().match
+            return lambda digest: match(digest) is not None
+        return lambda digest: len(digest) == length and not digest.encode('ascii', 'replace').translate(None, HEX_DIGITS)
+
     def check_logical_path(self, path, version, logical_paths, logical_directories):
         """Check logical path and accumulate paths/directories for E095 check.
 
@@ -382,34 +450,52 @@ class InventoryValidator(object):
         if path.startswith('/') or path.endswith('/'):
             self.error("E100", path=path)
         else:
-            m = re.match(r'''^(v\d+/''' + self.content_directory + r''')/(.*)''', path)
-            if m:
-                elements = m.group(2).split('/')
-                for element in elements:
+            # Must start v\d+/content_directory/, checked without a regex
+            elements = path.split('/')
+            version_dir = elements[0]
+            if (len(elements) > 2 and elements[1] == self.content_directory
+                    and version_dir.startswith('v') and version_dir[1:].isdecimal()):
+                for element in elements[2:]:
                     if element in ('', '.', '..'):
                         self.error("E099", path=path)
                         return
                 # Accumulate paths and directories
                 content_paths.add(path)
-                content_directories.add('/'.join([m.group(1)] + elements[0:-1]))
+                content_directories.add('/'.join(elements[0:-1]))
             else:
                 self.error("E042", path=path)
 
+    def file_map(self, version_dir):
+        """Get file map for version_dir in self.inventory, cached.
+
+        The same maps of the current inventory are used when checking each
+        prior version inventory against it, so build each only once.
+        """
+        if version_dir not in self.file_maps:
+            self.file_maps[version_dir] = get_file_map(self.inventory, version_dir)
+        return self.file_maps[version_dir]
+
     def validate_as_prior_version(self, prior):
         """Check that prior is a valid InventoryValidator for a prior version of the current inventory object.
 
         Both inventories are assumed to have been checked for internal consistency.
         """
         # Must have a subset of versions which also check zero padding format etc.
-        if not set(prior.all_versions) < set(self.all_versions):
+        # Both are in-sequence lists so this means prior must be a shorter prefix
+        num_prior_versions = len(prior.all_versions)
+        if not (num_prior_versions < len(self.all_versions)
+                and prior.all_versions == self.all_versions[:num_prior_versions]):
             self.error('E066a', prior_head=prior.head)
         else:
             # Check references to files but realize that there might be different
             # digest algorithms between versions
             for version_dir in prior.all_versions:
                 prior_map = get_file_map(prior.inventory, version_dir)
-                self_map = get_file_map(self.inventory, version_dir)
-                if prior_map.keys() != self_map.keys():
+                self_map = self.file_map(version_dir)
+                if prior_map == self_map:
+                    # Usual case, a single comparison shows all files match
+                    pass
+                elif prior_map.keys() != self_map.keys():
                     self.error('E066b', version_dir=version_dir, prior_head=prior.head)
                 else:
                     # Check them all...
@@ -8,6 +8,8 @@ import os.path
 import re
 import logging
 
+CODE_REGEX = re.compile(r'''([EW](\d\d\d))''')
+
 
 class ValidationLogger(object):
     """Class for OCFL ValidationLogger."""
@@ -21,19 +23,32 @@ class ValidationLogger(object):
         self.lang = lang
         self.codes = {}
         self.messages = []
+        self.sorted_messages = None  # cache for __str__, reset when messages added
         self.num_errors = 0
         self.num_warnings = 0
         self.info = 0
         self.spec = 'https://ocfl.io/draft/spec/'
-        if self.validation_codes is None:
+        self.templates = {}  # cache of message_template() results by (code, lang)
+        if ValidationLogger.validation_codes is None:
+            # Load once and share between all instances
             with open(os.path.join(os.path.dirname(__file__), 'data/validation-errors.json'), 'r') as fh:
-                self.validation_codes = json.load(fh)
+                ValidationLogger.validation_codes = json.load(fh)
 
-    def error_or_warning(self, code, severity='error', **args):
-        """Add error or warning to self.codes."""
+    def message_template(self, code):
+        """Look up message template for code in self.lang.
+
+        Returns a tuple (known, lang_desc, params, anchor) where known is
+        False if there is no description for code, lang_desc is the
+        description template (None if empty), params is the list of names
+        of parameters to substitute (None if there are none), and anchor
+        is the spec anchor to link to (None if no link).
+        """
+        known = False
+        lang_desc = None
+        params = None
         if code in self.validation_codes and 'description' in self.validation_codes[code]:
+            known = True
             desc = self.validation_codes[code]['description']
-            lang_desc = None
             if self.lang in desc:
                 lang_desc = desc[self.lang]
             elif 'en' in desc:
@@ -41,28 +56,41 @@ class ValidationLogger(object):
             elif len(desc) > 0:
                 # first key alphabetically
                 lang_desc = desc[sorted(list(desc.keys()))[0]]
-            else:
+            if 'params' in self.validation_codes[code]:
+                params = self.validation_codes[code]['params']
+        # Link to spec
+        anchor = None
+        m = CODE_REGEX.match(code)
+        if m and int(m.group(2)) < 200:
+            anchor = m.group(1)
+        return (known, lang_desc, params, anchor)
+
+    def error_or_warning(self, code, severity='error', **args):
+        """Add error or warning to self.codes."""
+        key = (code, self.lang)
+        if key not in self.templates:
+            self.templates[key] = self.message_template(code)
+        (known, lang_desc, params, anchor) = self.templates[key]
+        if known:
+            if lang_desc is None:
                 lang_desc = "Unknown " + severity + ": %s - no description, params (%s)"
             # Add in any parameters
-            if 'params' in self.validation_codes[code]:
-                params = []
-                for param in self.validation_codes[code]['params']:
-                    params.append(str(args[param]) if param in args else '???')
+            if params is not None:
                 try:
-                    lang_desc = lang_desc % tuple(params)
+                    lang_desc = lang_desc % tuple(str(args[param]) if param in args else '???' for param in params)
                 except TypeError:
                     lang_desc += str(args)
             message = '[' + code + '] ' + lang_desc
         else:
             message = "Unknown " + severity + ": %s - params (%s)" % (code, str(args))
         # Add link to spec
-        m = re.match(r'''([EW](\d\d\d))''', code)
-        if m and int(m.group(2)) < 200:
-            message += ' (see ' + self.spec + '#' + m.group(1) + ')'
+        if anchor is not None:
+            message += ' (see ' + self.spec + '#' + anchor + ')'
         # Store set of codes with last message for that code, and _full_ list of messages
         self.codes[code] = message
         if (severity == 'error' and self.show_errors) or (severity != 'error' and self.show_warnings):
             self.messages.append(message)
+            self.sorted_messages = None
 
     def error(self, code, **args):
         """Add error code to self.codes."""
@@ -76,7 +104,6 @@ class ValidationLogger(object):
 
     def __str__(self, prefix=''):
         """String of validator status."""
-        s = ''
-        for message in sorted(self.messages):
-            s += prefix + message + '\n'
-        return s[:-1]
+        if self.sorted_messages is None:
+            self.sorted_messages = sorted(self.messages)
+        return '\n'.join(prefix + message for message in self.sorted_messages)
@@ -38,7 +38,7 @@ def datetime_to_str(dt='now', no_fractions=False):
     return datetime.utcfromtimestamp(dt).isoformat() + 'Z'
 
 
-def str_to_datetime(s, context='datetime'):
+def str_to_datetime(s, context='datetime', return_flags=False):
     """Set timestamp from an W3C Datetime Last-Modified value.
 
     The sitemaps.org specification says that <lastmod> values
@@ -73,15 +73,21 @@ def str_to_datetime(s, context='datetime'):
     as 00.0 seconds.
 
     *** Extended to make timezone optional ***
+
+    If return_flags is True then returns a tuple (timestamp, has_timezone,
+    has_seconds) where the flags say whether the string s included a
+    timezone designator and seconds, so that callers need not scan s again.
+    Both flags are False for the date only forms.
     """
     t = None
     if s is None:
-        return(t)
+        return((t, False, False) if return_flags else t)
     if s == '':
         raise ValueError('Attempt to set empty %s' % (context))
     # Make a date into a full datetime
     m = re.match(r"\d\d\d\d(\-\d\d(\-\d\d)?)?$", s)
-    if m is not None:
+    date_only = m is not None
+    if date_only:
         if m.group(1) is None:
             s += '-01-01'
         elif m.group(2) is None:
@@ -120,4 +126,7 @@ def str_to_datetime(s, context='datetime'):
             offset_seconds = -offset_seconds
     # timetuple() ignores timezone information so we have to add in
     # the offset here, and any fractional component of the seconds
-    return(timegm(dt.timetuple()) + offset_seconds + fractional_seconds)
+    t = timegm(dt.timetuple()) + offset_seconds + fractional_seconds
+    if return_flags:
+        return((t, not date_only and m.group(3) is not None, not date_only and m.group(2) is not None))
+    return(t)
@@ -41,6 +41,8 @@ class TestAll(unittest.TestCase):
         """Test digest regex."""
         self.assertEqual(digest_regex('md5'), r'''^[0-9a-fA-F]{32}$''')
         self.assertRaises(ValueError, digest_regex, 'unknown_digest')
+        self.assertEqual(digest_regex('sha512'), r'''^[0-9a-fA-F]{128}$''')
+        self.assertEqual(digest_regex('sha512-spec-ex'), r'''^[0-9a-f]{15}\.\.\.[0-9a-f]{3}$''')
 
     def test_normalized_digest(self):
         """Test normalized_digest."""
@@ -1,7 +1,7 @@
 """Identity dispositor tests."""
 import os.path
 import unittest
-from ocfl.inventory_validator import InventoryValidator
+from ocfl.inventory_validator import InventoryValidator, looks_like_uri
 
 
 class TLogger(object):
@@ -28,6 +28,20 @@ class TLogger(object):
 class TestAll(unittest.TestCase):
     """TestAll class to run tests."""
 
+    def test_looks_like_uri(self):
+        """Test looks_like_uri function."""
+        self.assertTrue(looks_like_uri('info:a'))
+        self.assertTrue(looks_like_uri('http://example.org/x'))
+        self.assertTrue(looks_like_uri('a_1:b:c'))
+        self.assertTrue(looks_like_uri('\u00e9t\u00e9:b'))
+        self.assertFalse(looks_like_uri(''))
+        self.assertFalse(looks_like_uri('not_a_uri'))
+        self.assertFalse(looks_like_uri(':a'))
+        self.assertFalse(looks_like_uri('a:'))
+        self.assertFalse(looks_like_uri('a:\nb'))
+        self.assertFalse(looks_like_uri('a-b:c'))
+        self.assertFalse(looks_like_uri('a b:c'))
+
     def test_init(self):
         """Test object creation."""
         iv = InventoryValidator()
@@ -71,18 +85,40 @@ class TestAll(unittest.TestCase):
         log.clear()
         iv.validate({"id": "like:uri", "contentDirectory": ".."})
         self.assertIn('E018', log.errors)
+        # Manifest digests with empty path lists are not content
+        d1 = "4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706e"
+        d2 = "ae16b7632ee42fafd6b510e94a4951b2346ad90a1eff4baae2d7c0d5481515de61dcbc9a8d01f4824ab5215f033858189331859fb5b75fea5809230c63bad34a"
+        inventory = {"id": "like:uri",
+                     "type": "https://ocfl.io/1.0/spec/#inventory",
+                     "digestAlgorithm": "sha512",
+                     "head": "v1",
+                     "manifest": {d1: ["v1/content/a"], d2: []},
+                     "versions": {"v1": {"created": "2010-03-30T21:24:00Z",
+                                         "message": "A message",
+                                         "state": {d1: ["a"], d2: ["b"]},
+                                         "user": {"name": "A Person", "address": "info:uri1"}}}}
+        iv = InventoryValidator(log=log)
+        log.clear()
+        iv.validate(inventory)
+        self.assertEqual(log.errors, ['E050a'])
+        # ...and an unused one with an empty path list is not an error
+        del inventory["versions"]["v1"]["state"][d2]
+        iv = InventoryValidator(log=log)
+        log.clear()
+        iv.validate(inventory)
+        self.assertEqual(log.errors, [])
 
     def test_validate_manifest(self):
         """Test validate_manifest method."""
         log = TLogger()
         iv = InventoryValidator(log=log)
-        self.assertEqual(iv.validate_manifest("not a manifest"), ({}, set()))
+        self.assertEqual(iv.validate_manifest("not a manifest"), (set(), set(), set()))
         self.assertIn('E041c', log.errors)
         log.clear()
-        self.assertEqual(iv.validate_manifest({"xxx": []}), ({}, set()))
+        self.assertEqual(iv.validate_manifest({"xxx": []}), (set(), set(), set()))
         self.assertIn('E025a', log.errors)
         log.clear()
-        self.assertEqual(iv.validate_manifest({"067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": "not an array"}), ({}, set()))
+        self.assertEqual(iv.validate_manifest({"067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": "not an array"}), (set(), set(), set()))
         self.assertIn('E092', log.errors)
         log.clear()
         iv.lax_digests = True
@@ -90,15 +126,17 @@ class TestAll(unittest.TestCase):
             {
                 "067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": [],
                 "067ECA3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": []
-            }), ({}, set([
+            }), (set(), set([
                 "067ECA3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7",
                 "067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7"
-            ])))
+            ]), set()))
         self.assertIn('E096', log.errors)
         log.clear()
         # Conflicting content paths
-        iv.validate_manifest({"067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": ['v1/content/a', 'v1/content/a/b']})
+        (manifest_files, unnormalized_digests, content_digests) = iv.validate_manifest({"067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7": ['v1/content/a', 'v1/content/a/b']})
         self.assertEqual(log.errors, ['E101'])
+        self.assertEqual(manifest_files, set(['v1/content/a', 'v1/content/a/b']))
+        self.assertEqual(content_digests, set(["067eca3f5b024afa00aeac03a3c42dc0042bf43cba56104037abea8b365c0cf672f0e0c14c91b82bbce6b1464e231ac285d630a82cd4d4a7b194bea04d4b2eb7"]))
 
     def test_validate_fixity(self):
         """Test validate_fixity method."""
@@ -162,6 +200,9 @@ class TestAll(unittest.TestCase):
         self.assertEqual(iv.validate_version_sequence({"v1": {}, 'v2': {}, 'v4': {}}), ['v1', 'v2'])
         self.assertIn('E010', log.errors)
         log.clear()
+        self.assertEqual(iv.validate_version_sequence({"v001": {}, 'v002': {}, 'extra': {}}), ['v001', 'v002'])
+        self.assertEqual(log.errors, ['E010'])
+        log.clear()
         self.assertEqual(iv.validate_version_sequence({"v01": {}, 'v02': {}, 'v03': {}, "v04": {}, 'v05': {}, 'v06': {}, "v07": {}, 'v08': {}, 'v09': {}}), ['v01', 'v02', 'v03', 'v04', 'v05', 'v06', 'v07', 'v08', 'v09'])
         self.assertEqual(len(log.errors), 0)
         log.clear()
@@ -172,14 +213,14 @@ class TestAll(unittest.TestCase):
         """Test validate_versions method."""
         log = TLogger()
         iv = InventoryValidator(log=log)
-        self.assertEqual(iv.validate_versions({}, [], set()), [])
+        self.assertEqual(iv.validate_versions({}, [], set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
-        self.assertEqual(iv.validate_versions({}, [], set()), [])
+        self.assertEqual(iv.validate_versions({}, [], set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
         # First, no useful data
-        self.assertEqual(iv.validate_versions({'v1': {}}, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions({'v1': {}}, ['v1'], set()), set())
         self.assertIn('E048', log.errors)
         self.assertIn('E048c', log.errors)
         self.assertIn('W007a', log.warns)
@@ -190,42 +231,42 @@ class TestAll(unittest.TestCase):
                            "message": "A useful message",
                            "state": {},
                            "user": {"name": "A Person", "address": "info:uri1"}}}
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertEqual(log.errors, [])
         log.clear()
         versions['v1']['created'] = {}  # not a string
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E049d', log.errors)
         log.clear()
         versions['v1']['created'] = "not a datetime"
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E049c', log.errors)
         log.clear()
         versions['v1']['created'] = "2010-03-30T21:24:00"  # no timezone
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E049a', log.errors)
         log.clear()
         versions['v1']['created'] = "2010-03-30T21:24Z"  # no seconds
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E049b', log.errors)
         log.clear()
         versions['v1']['created'] = "2010-03-30T21:24:00Z"
         versions['v1']['message'] = {}  # not a string
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E094', log.errors)
         log.clear()
         versions['v1']['message'] = "A message"
         versions['v1']['user'] = "A string"  # not a dict
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E054a', log.errors)
         log.clear()
         versions['v1']['user'] = {"name": {}, "address": {}}  # not strings
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('E054b', log.errors)
         self.assertIn('E054c', log.errors)
         log.clear()
         versions['v1']['user'] = {"name": "A Person"}  # no address
-        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), [])
+        self.assertEqual(iv.validate_versions(versions, ['v1'], set()), set())
         self.assertIn('W008', log.warns)
 
     def test_validate_state_block(self):
@@ -233,41 +274,41 @@ class TestAll(unittest.TestCase):
         log = TLogger()
         iv = InventoryValidator(log=log)
         iv.digest_algorithm = 'sha512'
-        self.assertEqual(iv.validate_state_block({}, "v1", set()), [])
+        self.assertEqual(iv.validate_state_block({}, "v1", set()), set())
         self.assertEqual(len(log.errors), 0)
         log.clear()
-        self.assertEqual(iv.validate_state_block("invalid", "v1", set()), [])
+        self.assertEqual(iv.validate_state_block("invalid", "v1", set()), set())
         self.assertIn('E050c', log.errors)
         log.clear()
-        self.assertEqual(iv.validate_state_block({"not a digest": []}, "v1", set()), [])
+        self.assertEqual(iv.validate_state_block({"not a digest": []}, "v1", set()), set())
         self.assertIn('E050d', log.errors)
         log.clear()
         d = "4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706e"
-        self.assertEqual(iv.validate_state_block({d: "not a list"}, "v1", set()), [])
+        self.assertEqual(iv.validate_state_block({d: "not a list"}, "v1", set()), set())
         self.assertIn('E050e', log.errors)
         log.clear()
-        self.assertEqual(iv.validate_state_block({d: ["good path", 'a/./b']}, "v1", set()), [d])
+        self.assertEqual(iv.validate_state_block({d: ["good path", 'a/./b']}, "v1", set()), set([d]))
         self.assertIn('E052', log.errors)
         log.clear()
-        self.assertEqual(iv.validate_state_block({d: ["good path", '/']}, "v1", set()), [d])
+        self.assertEqual(iv.validate_state_block({d: ["good path", '/']}, "v1", set()), set([d]))
         self.assertIn('E053', log.errors)
         log.clear()
         # Finally a good case
         d2 = "ae16b7632ee42fafd6b510e94a4951b2346ad90a1eff4baae2d7c0d5481515de61dcbc9a8d01f4824ab5215f033858189331859fb5b75fea5809230c63bad34a"
-        self.assertEqual(iv.validate_state_block({d2: ["path2", "good/path3"]}, "v1", set([d, d2])), [d2])
+        self.assertEqual(iv.validate_state_block({d2: ["path2", "good/path3"]}, "v1", set([d, d2])), set([d2]))
         self.assertEqual(log.errors, [])
 
     def test_check_digests_present_and_used(self):
         """Test check_digests_present_and_used."""
         log = TLogger()
         iv = InventoryValidator(log=log)
-        manifest = {'file_aaa1': 'aaa', 'file_aaa2': 'aaa', 'file_bbb': 'bbb'}
-        iv.check_digests_present_and_used(manifest, ['aaa', 'bbb'])
+        manifest = set(['aaa', 'bbb'])
+        iv.check_digests_present_and_used(manifest, set(['aaa', 'bbb']))
         self.assertEqual(len(log.errors), 0)
-        iv.check_digests_present_and_used(manifest, ['aaa'])
+        iv.check_digests_present_and_used(manifest, set(['aaa']))
         self.assertIn('E050b', log.errors)
         log.clear()
-        iv.check_digests_present_and_used(manifest, ['aaa', 'bbb', 'ccc'])
+        iv.check_digests_present_and_used(manifest, set(['aaa', 'bbb', 'ccc']))
         self.assertIn('E050a', log.errors)
 
     def test_digest_regex(self):
@@ -284,6 +325,44 @@ class TestAll(unittest.TestCase):
         self.assertEqual(iv.digest_regex(), '^.*$')
         self.assertEqual(log.errors, [])
 
+    def test_digest_checker(self):
+        """Test digest_checker."""
+        log = TLogger()
+        iv = InventoryValidator(log=log)
+        check = iv.digest_checker()
+        self.assertTrue(check("4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706e"))
+        self.assertTrue(check("4A89417821564B1E1956130569C390DD6122B51296EC620CADD0555FF5AAE21C2A17383A194290FC95C73C63261BD8CB77AC275C85E6300CD711FA132FE8706E"))
+        self.assertFalse(check("4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706"))
+        self.assertFalse(check("4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706g"))
+        self.assertFalse(check("4a89417821564b1e1956130569c390dd6122b51296ec620cadd0555ff5aae21c2a17383a194290fc95c73c63261bd8cb77ac275c85e6300cd711fa132fe8706\u00e9"))
+        self.assertFalse(check(""))
+        iv.digest_algorithm = 'md5'
+        check = iv.digest_checker()
+        self.assertTrue(check("68b329da9893e34099c7d8ad5cb9c940"))
+        self.assertFalse(check("68b329da9893e34099c7d8ad5cb9c94"))
+        iv.digest_algorithm = 'sha512-spec-ex'
+        check = iv.digest_checker()
+        self.assertTrue(check("ffccf6baa218130...0e9"))
+        self.assertFalse(check("ffccf6baa218130"))
+        self.assertEqual(log.errors, [])
+        # Unknown algorithm reported once, then anything matches
+        iv.digest_algorithm = 'not a digest'
+        check = iv.digest_checker()
+        self.assertEqual(log.errors, ['E026a'])
+        self.assertTrue(check("anything"))
+        self.assertTrue(check("else"))
+        self.assertEqual(log.errors, ['E026a'])
+
+    def test_file_map(self):
+        """Test file_map method."""
+        iv = InventoryValidator(log=TLogger())
+        iv.inventory = {"manifest": {"a1d1": ["v1/content/f1"],
+                                     "a1d2": ["v1/content/f2"]},
+                        "versions": {"v1": {"state": {"a1d1": ["f1", "f1-copy"], "a1d2": ["f2"], "a1d3": ["f3"]}}}}
+        fm = iv.file_map('v1')
+        self.assertEqual(fm, {"f1": ["v1/content/f1"], "f1-copy": ["v1/content/f1"], "f2": ["v1/content/f2"]})
+        self.assertIs(iv.file_map('v1'), fm)
+
     def test_validate_as_prior_version(self):
         """Test validate_as_prior_version method."""
         log = TLogger()
@@ -295,6 +374,11 @@ class TestAll(unittest.TestCase):
         iv.validate_as_prior_version(prior)
         self.assertEqual(log.errors, ['E066a'])
         log.clear()
+        # Nor will different zero padding
+        iv.all_versions = ['v01', 'v02']
+        iv.validate_as_prior_version(prior)
+        self.assertEqual(log.errors, ['E066a'])
+        log.clear()
         # Good inventory in spite of diferent digests
         iv.all_versions = ['v1', 'v2']
         iv.inventory = {"manifest": {"a1d1": ["v1/content/f1"],
@@ -0,0 +1,50 @@
+"""ValidationLogger tests."""
+import unittest
+from ocfl.validation_logger import ValidationLogger
+
+
+class TestAll(unittest.TestCase):
+    """TestAll class to run tests."""
+
+    def test_init(self):
+        """Test object creation."""
+        vl1 = ValidationLogger()
+        self.assertIn('E001a', vl1.validation_codes)
+        vl2 = ValidationLogger(lang='fr')
+        self.assertIs(vl1.validation_codes, vl2.validation_codes)
+        self.assertIs(ValidationLogger.validation_codes, vl1.validation_codes)
+
+    def test_error_or_warning(self):
+        """Test error_or_warning method."""
+        vl = ValidationLogger(show_warnings=True)
+        vl.error_or_warning('E050d', severity='error', where='root', version='v1', digest='abc')
+        self.assertEqual(vl.codes['E050d'], '[E050d] OCFL Object root inventory v1 version state block includes a bad digest (abc) (see https://ocfl.io/draft/spec/#E050)')
+        # Missing params and repeated use of cached template
+        vl.error_or_warning('E050d', severity='error', where='v2')
+        self.assertEqual(vl.codes['E050d'], '[E050d] OCFL Object v2 inventory ??? version state block includes a bad digest (???) (see https://ocfl.io/draft/spec/#E050)')
+        vl.error_or_warning('W004', severity='warning', where='root')
+        self.assertEqual(vl.codes['W004'], '[W004] OCFL Object root inventory SHOULD use sha512 but uses sha256 as the DigestAlgorithm (see https://ocfl.io/draft/spec/#W004)')
+        # Unknown code
+        vl.error_or_warning('X999', severity='warning', a='b')
+        self.assertEqual(vl.codes['X999'], "Unknown warning: X999 - params ({'a': 'b'})")
+        self.assertEqual(len(vl.messages), 4)
+
+    def test_message_template(self):
+        """Test message_template method."""
+        vl = ValidationLogger()
+        self.assertEqual(vl.message_template('W004'),
+                         (True, 'OCFL Object %s inventory SHOULD use sha512 but uses sha256 as the DigestAlgorithm', ['where'], 'W004'))
+        self.assertEqual(vl.message_template('E199'), (False, None, None, 'E199'))
+        self.assertEqual(vl.message_template('E999'), (False, None, None, None))
+        self.assertEqual(vl.message_template('X999'), (False, None, None, None))
+
+    def test_str(self):
+        """Test __str__ method."""
+        vl = ValidationLogger()
+        self.assertEqual(str(vl), '')
+        vl.error('X002')
+        vl.error('X001')
+        self.assertEqual(str(vl), "Unknown error: X001 - params ({})\nUnknown error: X002 - params ({})")
+        self.assertEqual(vl.__str__(prefix='> '), "> Unknown error: X001 - params ({})\n> Unknown error: X002 - params ({})")
+        vl.error('X000')
+        self.assertEqual(str(vl).split('\n')[0], "Unknown error: X000 - params ({})")
@@ -77,6 +77,16 @@ class TestW3cDatetime(unittest.TestCase):
         # Special case
         self.assertEqual(str_to_datetime(None), None)
 
+    def test02_str_to_datetime_flags(self):
+        """Reading with flags for timezone and seconds."""
+        self.assertEqual(str_to_datetime("1970-01-01T00:00:00Z", return_flags=True), (0, True, True))
+        self.assertEqual(str_to_datetime("1970-01-01T00:00:00.5+00:00", return_flags=True), (0.5, True, True))
+        self.assertEqual(str_to_datetime("1970-01-01T00:00:00", return_flags=True), (0, False, True))
+        self.assertEqual(str_to_datetime("1970-01-01T00:00Z", return_flags=True), (0, True, False))
+        self.assertEqual(str_to_datetime("1970-01-01T00:00", return_flags=True), (0, False, False))
+        self.assertEqual(str_to_datetime("1970-01-01", return_flags=True), (0, False, False))
+        self.assertEqual(str_to_datetime(None, return_flags=True), (None, False, False))
+
     def test03_same(self):
         """Datetime values that are the same."""
         astr = '2012-01-01T00:00:00Z'